@@ -7,7 +7,6 @@ from urllib.parse import urlencode
 import asyncio
 import base64
 import binascii
-import cgi
 import datetime
 import json
 import logging
@@ -100,6 +99,8 @@ class Client:
         # Future for Channel.listen (populated by .connect()):
         self._listen_future = None
 
+        # Request header shared by all requests. It's built once here and copied
+        # into each request message, so it must not be modified per request.
         self.gc_request_header = googlechat_pb2.RequestHeader(
             client_type=googlechat_pb2.RequestHeader.ClientType.WEB,
             client_version=2440378181258,
@@ -223,10 +224,10 @@ class Client:
                         continue
 
                     resp.raise_for_status()
-                    try:
-                        _, params = cgi.parse_header(resp.headers["Content-Disposition"])
-                        filename = params.get("filename") or url.path.split("/")[-1]
-                    except KeyError:
+                    disposition = resp.content_disposition
+                    if disposition and disposition.filename:
+                        filename = disposition.filename
+                    else:
                         filename = url.path.split("/")[-1]
                     mime = resp.headers["Content-Type"]
                     data = await self.read_with_max_size(resp, max_size)
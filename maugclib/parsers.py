@@ -1,6 +1,7 @@
 """Parsing helper functions."""
 
 import datetime
+import functools
 
 from . import googlechat_pb2
 
@@ -32,7 +33,13 @@ def id_from_group_id(group_id: googlechat_pb2.GroupId) -> str:
         return ""
 
 
+@functools.lru_cache(maxsize=4096)
 def group_id_from_id(conversation_id: str) -> googlechat_pb2.GroupId:
+    """Convert a conversation ID string into a GroupId.
+
+    The result is cached, so it must not be modified. Passing it as a field
+    to another message constructor makes a copy, which is fine.
+    """
     if conversation_id.startswith("dm:"):
         return googlechat_pb2.GroupId(
             dm_id=googlechat_pb2.DmId(
@@ -16,6 +16,7 @@
 from __future__ import annotations
 
 from typing import Any
+import asyncio
 
 from mautrix.bridge import Bridge
 from mautrix.types import RoomID, UserID
@@ -65,15 +66,22 @@ class GoogleChatBridge(Bridge):
         self.config["bridge.resend_bridge_info"] = False
         self.config.save()
         self.log.info("Re-sending bridge info state event to all portals")
-        async for portal in Portal.all():
-            await portal.update_bridge_info()
+        semaphore = asyncio.Semaphore(16)
+
+        async def resend(portal: Portal) -> None:
+            async with semaphore:
+                await portal.update_bridge_info()
+
+        await asyncio.gather(*[resend(portal) async for portal in Portal.all()])
         self.log.info("Finished re-sending bridge info state events")
 
     def prepare_stop(self) -> None:
-        self.add_shutdown_actions(user.stop() for user in User.by_mxid.values())
+        self.add_shutdown_actions(User.stop_all())
         self.log.debug("Stopping puppet syncers")
         for puppet in Puppet.by_custom_mxid.values():
             puppet.stop()
+        if Puppet.http:
+            self.add_shutdown_actions(Puppet.http.close())
 
     async def start(self) -> None:
         self.add_startup_actions(User.init_cls(self))
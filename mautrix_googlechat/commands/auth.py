@@ -97,7 +97,8 @@ async def login_cookie(evt: CommandEvent) -> EventID:
         await evt.sender.connect(Cookies(**{k.lower(): v for k, v in data.items()}))
     except NotLoggedInError:
         return await evt.reply("Those cookies don't seem to be valid")
-    await evt.sender.name_future
+    if not await evt.sender.wait_for_name():
+        return await evt.reply("Failed to get own info after login")
     return await evt.reply(
         f"Successfully logged in as {evt.sender.name} &lt;{evt.sender.email}&gt; "
         f"({evt.sender.gcid})"
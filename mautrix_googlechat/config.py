@@ -33,6 +33,7 @@ class Config(BaseBridgeConfig):
         copy("bridge.command_prefix")
 
         copy("bridge.initial_chat_sync")
+        copy("bridge.sync_concurrency")
         copy("bridge.invite_own_puppet_to_pm")
         copy("bridge.sync_with_custom_puppets")
         copy("bridge.sync_direct_chat_list")
@@ -84,7 +85,7 @@ class Config(BaseBridgeConfig):
         if mxid in permissions:
             return self._get_permissions(mxid)
 
-        homeserver = mxid[mxid.index(":") + 1 :]
+        _, _, homeserver = mxid.partition(":")
         if homeserver in permissions:
             return self._get_permissions(homeserver)
 
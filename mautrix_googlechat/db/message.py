@@ -15,7 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, ClassVar
+from typing import TYPE_CHECKING, ClassVar, Iterable
 
 from asyncpg import Record
 from attr import dataclass
@@ -26,7 +26,7 @@ from mautrix.util.async_db import Database
 fake_db = Database.create("") if TYPE_CHECKING else None
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     db: ClassVar[Database] = fake_db
 
@@ -45,7 +45,8 @@ class Message:
     def _from_row(cls, row: Record | None) -> Message | None:
         if row is None:
             return None
-        return cls(**row)
+        # Columns are selected in field order, see cls.columns
+        return cls(*row)
 
     columns = (
         "mxid, mx_room, gcid, gc_chat, gc_receiver, gc_parent_id, "
@@ -93,6 +94,18 @@ class Message:
         row = await cls.db.fetchrow(q, mxid, mx_room)
         return cls._from_row(row)
 
+    @classmethod
+    async def get_many_by_mxid(
+        cls, mxids: Iterable[EventID | None], mx_room: RoomID
+    ) -> dict[EventID, Message]:
+        mxids = list({mxid for mxid in mxids if mxid})
+        if not mxids:
+            return {}
+        placeholders = ", ".join(f"${i}" for i in range(2, len(mxids) + 2))
+        q = f"SELECT {cls.columns} FROM message WHERE mx_room=$1 AND mxid IN ({placeholders})"
+        rows = await cls.db.fetch(q, mx_room, *mxids)
+        return {row["mxid"]: cls._from_row(row) for row in rows}
+
     @classmethod
     async def get_most_recent(cls, gc_chat: str, gc_receiver: str) -> Message | None:
         q = (
@@ -114,14 +127,15 @@ class Message:
         row = await cls.db.fetchrow(q, gc_chat, gc_receiver, timestamp)
         return cls._from_row(row)
 
-    async def insert(self) -> None:
-        q = (
-            "INSERT INTO message (mxid, mx_room, gcid, gc_chat, gc_receiver, gc_parent_id, "
-            '                     "index", timestamp, msgtype, gc_sender) '
-            "VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)"
-        )
-        await self.db.execute(
-            q,
+    _insert_query: ClassVar[str] = (
+        "INSERT INTO message (mxid, mx_room, gcid, gc_chat, gc_receiver, gc_parent_id, "
+        '                     "index", timestamp, msgtype, gc_sender) '
+        "VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)"
+    )
+
+    @property
+    def _values(self):
+        return (
             self.mxid,
             self.mx_room,
             self.gcid,
@@ -134,6 +148,13 @@ class Message:
             self.gc_sender,
         )
 
+    async def insert(self) -> None:
+        await self.db.execute(self._insert_query, *self._values)
+
+    @classmethod
+    async def bulk_insert(cls, messages: Iterable[Message]) -> None:
+        await cls.db.executemany(cls._insert_query, [msg._values for msg in messages])
+
     async def delete(self) -> None:
         q = 'DELETE FROM message WHERE gcid=$1 AND gc_receiver=$2 AND "index"=$3'
         await self.db.execute(q, self.gcid, self.gc_receiver, self.index)
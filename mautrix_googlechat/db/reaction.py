@@ -26,7 +26,7 @@ from mautrix.util.async_db import Database
 fake_db = Database.create("") if TYPE_CHECKING else None
 
 
-@dataclass
+@dataclass(slots=True)
 class Reaction:
     db: ClassVar[Database] = fake_db
 
@@ -43,7 +43,8 @@ class Reaction:
     def _from_row(cls, row: Record | None) -> Reaction | None:
         if row is None:
             return None
-        return cls(**row)
+        # Columns are selected in field order, see cls.columns
+        return cls(*row)
 
     columns = "mxid, mx_room, emoji, gc_sender, gc_msgid, gc_chat, gc_receiver, timestamp"
 
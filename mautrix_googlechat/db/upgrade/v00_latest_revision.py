@@ -18,7 +18,7 @@ from mautrix.util.async_db import Connection
 from . import upgrade_table
 
 
-@upgrade_table.register(description="Latest revision", upgrades_to=10)
+@upgrade_table.register(description="Latest revision", upgrades_to=11)
 async def upgrade_latest(conn: Connection) -> None:
     await conn.execute(
         """CREATE TABLE "user" (
@@ -87,6 +87,9 @@ async def upgrade_latest(conn: Connection) -> None:
             UNIQUE (mxid, mx_room)
         )"""
     )
+    await conn.execute(
+        'CREATE INDEX message_chat_timestamp_idx ON "message" (gc_chat, gc_receiver, timestamp)'
+    )
     await conn.execute(
         """CREATE TABLE reaction (
             mxid         TEXT NOT NULL,
@@ -0,0 +1,25 @@
+# mautrix-googlechat - A Matrix-Google Chat puppeting bridge
+# Copyright (C) 2023 Tulir Asokan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from mautrix.util.async_db import Connection
+
+from . import upgrade_table
+
+
+@upgrade_table.register(description="Add index for finding latest messages in a chat")
+async def upgrade_v11(conn: Connection) -> None:
+    await conn.execute(
+        'CREATE INDEX message_chat_timestamp_idx ON "message" (gc_chat, gc_receiver, timestamp)'
+    )
@@ -15,7 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, ClassVar
+from typing import TYPE_CHECKING, ClassVar, Iterable
 import json
 
 from asyncpg import Record
@@ -94,12 +94,17 @@ class User:
     async def delete(self) -> None:
         await self.db.execute('DELETE FROM "user" WHERE mxid=$1', self.mxid)
 
+    _update_query: ClassVar[str] = (
+        'UPDATE "user" SET gcid=$2, cookies=$3, user_agent=$4, notice_room=$5, revision=$6 '
+        "WHERE mxid=$1"
+    )
+
     async def save(self) -> None:
-        q = (
-            'UPDATE "user" SET gcid=$2, cookies=$3, user_agent=$4, notice_room=$5, revision=$6 '
-            "WHERE mxid=$1"
-        )
-        await self.db.execute(q, *self._values)
+        await self.db.execute(self._update_query, *self._values)
+
+    @classmethod
+    async def save_many(cls, users: Iterable[User]) -> None:
+        await cls.db.executemany(cls._update_query, [user._values for user in users])
 
     async def set_revision(self, revision: int) -> None:
         if self.revision and self.revision >= revision > 0:
@@ -25,7 +25,7 @@ import aiohttp
 from maugclib import googlechat_pb2 as googlechat
 from mautrix.util import magic
 
-from .. import portal as po, user as u
+from .. import portal as po, puppet as pu, user as u
 
 try:
     from mautrix.crypto.attachments import async_inplace_encrypt_attachment
@@ -59,7 +59,7 @@ async def _reupload_preview(
         if source:
             data, mime, _ = await source.client.download_attachment(url, max_size=max_size)
         else:
-            async with aiohttp.ClientSession() as sess, sess.get(url) as resp:
+            async with pu.Puppet.http.get(url) as resp:
                 data = bytearray(await resp.read())
                 mime = resp.headers.get("Content-Type") or magic.mimetype(data)
     except aiohttp.ClientError:
@@ -182,7 +182,7 @@ async def _fetch_youtube_oembed(url: str) -> dict[str, Any]:
         }
     )
     try:
-        async with aiohttp.ClientSession(headers=bot_hdrs) as sess, sess.get(oembed_url) as resp:
+        async with pu.Puppet.http.get(oembed_url, headers=bot_hdrs) as resp:
             if resp.status == 404:
                 log.debug(f"Didn't find oEmbed info for {url}")
                 data = {}
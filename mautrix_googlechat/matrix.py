@@ -57,12 +57,14 @@ class MatrixHandler(BaseMatrixHandler):
             )
 
     async def handle_join(self, room_id: RoomID, user_id: UserID, event_id: EventID) -> None:
-        user = await u.User.get_by_mxid(user_id)
-
         portal = await po.Portal.get_by_mxid(room_id)
         if not portal:
             return
 
+        user = await u.User.get_by_mxid(user_id)
+        if not user:
+            return
+
         if not user.is_whitelisted:
             await portal.main_intent.kick_user(
                 room_id, user.mxid, "You are not whitelisted on this Google Chat bridge."
@@ -130,14 +132,14 @@ class MatrixHandler(BaseMatrixHandler):
                 f"relation type {content.relates_to.rel_type}"
             )
             return
-        user = await u.User.get_by_mxid(user_id)
-        if not user:
-            return
-
         portal = await po.Portal.get_by_mxid(room_id)
         if not portal:
             return
 
+        user = await u.User.get_by_mxid(user_id)
+        if not user:
+            return
+
         await portal.handle_matrix_reaction(
             user, event_id, content.relates_to.event_id, content.relates_to.key
         )
@@ -146,14 +148,14 @@ class MatrixHandler(BaseMatrixHandler):
     async def handle_redaction(
         room_id: RoomID, user_id: UserID, event_id: EventID, redaction_event_id: EventID
     ) -> None:
-        user = await u.User.get_by_mxid(user_id)
-        if not user:
-            return
-
         portal = await po.Portal.get_by_mxid(room_id)
         if not portal:
             return
 
+        user = await u.User.get_by_mxid(user_id)
+        if not user:
+            return
+
         await portal.handle_matrix_redaction(user, event_id, redaction_event_id)
 
     async def handle_event(self, evt: Event) -> None:
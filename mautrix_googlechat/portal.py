@@ -21,6 +21,7 @@ import asyncio
 import mimetypes
 import random
 import time
+import weakref
 
 from yarl import URL
 import aiohttp
@@ -92,16 +93,19 @@ class AttachmentURL(NamedTuple):
 
 class Portal(DBPortal, BasePortal):
     invite_own_puppet_to_pm: bool = False
+    # Portals with a Matrix room are kept alive by by_mxid, only room-less ones can be collected
     by_mxid: dict[RoomID, Portal] = {}
-    by_gcid: dict[tuple[str, str], Portal] = {}
+    by_gcid: weakref.WeakValueDictionary[tuple[str, str], Portal] = weakref.WeakValueDictionary()
     matrix: m.MatrixHandler
     config: Config
     private_chat_portal_meta: Literal["default", "always", "never"]
+    bridge_info_protocol: dict[str, str]
 
     _main_intent: IntentAPI | None
-    _create_room_lock: asyncio.Lock
+    _create_room_lock: asyncio.Lock | None
     _last_bridged_mxid: EventID | None
-    _dedup: deque[str]
+    _dedup: set[str]
+    _dedup_queue: deque[str]
     _local_dedup: set[str]
     _send_locks: dict[str, asyncio.Lock]
     _edit_dedup: dict[str, int]
@@ -147,11 +151,12 @@ class Portal(DBPortal, BasePortal):
         self.log = self.log.getChild(self.gcid_log)
 
         self._main_intent = None
-        self._create_room_lock = asyncio.Lock()
+        self._create_room_lock = None
         self._incoming_events = asyncio.Queue()
         self._event_dispatcher_task = None
         self._last_bridged_mxid = None
-        self._dedup = deque(maxlen=100)
+        self._dedup = set()
+        self._dedup_queue = deque(maxlen=100)
         self._edit_dedup = {}
         self._local_dedup = set()
         self._send_locks = {}
@@ -169,6 +174,11 @@ class Portal(DBPortal, BasePortal):
         cls.matrix = bridge.matrix
         cls.invite_own_puppet_to_pm = cls.config["bridge.invite_own_puppet_to_pm"]
         cls.private_chat_portal_meta = cls.config["bridge.private_chat_portal_meta"]
+        cls.bridge_info_protocol = {
+            "id": "googlechat",
+            "displayname": "Google Chat",
+            "avatar_url": cls.config["appservice.bot_avatar"],
+        }
         NotificationDisabler.puppet_cls = p.Puppet
         NotificationDisabler.config_enabled = cls.config["bridge.backfill.disable_notifications"]
 
@@ -361,16 +371,17 @@ class Portal(DBPortal, BasePortal):
             puppet: p.Puppet = await p.Puppet.get_by_gcid(user.user_id.id)
             tasks.append(asyncio.create_task(self._update_participant(source, puppet, user)))
             extra_members.pop(puppet.intent_for(self).mxid, None)
-        await asyncio.gather(*tasks)
         for member in extra_members:
             puppet: p.Puppet = await p.Puppet.get_by_mxid(member)
             if puppet:
-                try:
-                    await puppet.default_mxid_intent.leave_room(
-                        self.mxid, reason="User is not in group"
-                    )
-                except Exception:
-                    self.log.exception("Failed to leave extra ghost user from room")
+                tasks.append(asyncio.create_task(self._remove_extra_participant(puppet)))
+        await asyncio.gather(*tasks)
+
+    async def _remove_extra_participant(self, puppet: p.Puppet) -> None:
+        try:
+            await puppet.default_mxid_intent.leave_room(self.mxid, reason="User is not in group")
+        except Exception:
+            self.log.exception("Failed to leave extra ghost user from room")
 
     async def _update_participant(
         self, source: u.User, puppet: p.Puppet, user: googlechat.User
@@ -533,7 +544,11 @@ class Portal(DBPortal, BasePortal):
     def queue_event(self, user: u.User, evt: googlechat.Event) -> None:
         self._incoming_events.put_nowait((user, evt))
         if not self._event_dispatcher_task or self._event_dispatcher_task.done():
-            self._event_dispatcher_task = asyncio.create_task(self._try_event_dispatcher_loop())
+            # asyncio only keeps weak references to tasks, background_task keeps the loop (and
+            # therefore this portal) alive even if it isn't cached anywhere else.
+            self._event_dispatcher_task = background_task.create(
+                self._try_event_dispatcher_loop(), catch_errors=False
+            )
 
     async def handle_event(self, source: u.User, evt: googlechat.Event) -> bool:
         if evt.body.HasField("message_posted"):
@@ -583,6 +598,9 @@ class Portal(DBPortal, BasePortal):
         if self.mxid:
             await self.update_matrix_room(source, info)
             return self.mxid
+        # Most portals never need to create a room, so the lock is only made when needed
+        if self._create_room_lock is None:
+            self._create_room_lock = asyncio.Lock()
         async with self._create_room_lock:
             try:
                 return await self._create_matrix_room(source, info)
@@ -598,11 +616,7 @@ class Portal(DBPortal, BasePortal):
         return {
             "bridgebot": self.az.bot_mxid,
             "creator": self.main_intent.mxid,
-            "protocol": {
-                "id": "googlechat",
-                "displayname": "Google Chat",
-                "avatar_url": self.config["appservice.bot_avatar"],
-            },
+            "protocol": self.bridge_info_protocol,
             "channel": {
                 "id": self.gcid,
                 "displayname": self.name,
@@ -617,20 +631,23 @@ class Portal(DBPortal, BasePortal):
             return
         try:
             self.log.debug("Updating bridge info...")
-            await self.main_intent.send_state_event(
-                self.mxid,
-                StateBridge,
-                self.bridge_info,
-                self.bridge_info_state_key,
-                timestamp=timestamp,
-            )
-            # TODO remove this once https://github.com/matrix-org/matrix-doc/pull/2346 is in spec
-            await self.main_intent.send_state_event(
-                self.mxid,
-                StateHalfShotBridge,
-                self.bridge_info,
-                self.bridge_info_state_key,
-                timestamp=timestamp,
+            bridge_info = self.bridge_info
+            await asyncio.gather(
+                self.main_intent.send_state_event(
+                    self.mxid,
+                    StateBridge,
+                    bridge_info,
+                    self.bridge_info_state_key,
+                    timestamp=timestamp,
+                ),
+                # TODO remove this once https://github.com/matrix-org/matrix-doc/pull/2346 is in spec
+                self.main_intent.send_state_event(
+                    self.mxid,
+                    StateHalfShotBridge,
+                    bridge_info,
+                    self.bridge_info_state_key,
+                    timestamp=timestamp,
+                ),
             )
         except Exception:
             self.log.warning("Failed to update bridge info", exc_info=True)
@@ -650,6 +667,7 @@ class Portal(DBPortal, BasePortal):
         if self.is_direct:
             power_levels.users[source.mxid] = 50
         power_levels.users[self.main_intent.mxid] = 100
+        bridge_info = self.bridge_info
         initial_state = [
             {
                 "type": str(EventType.ROOM_POWER_LEVELS),
@@ -658,13 +676,13 @@ class Portal(DBPortal, BasePortal):
             {
                 "type": str(StateBridge),
                 "state_key": self.bridge_info_state_key,
-                "content": self.bridge_info,
+                "content": bridge_info,
             },
             {
                 # TODO remove this once https://github.com/matrix-org/matrix-doc/pull/2346 is in spec
                 "type": str(StateHalfShotBridge),
                 "state_key": self.bridge_info_state_key,
-                "content": self.bridge_info,
+                "content": bridge_info,
             },
         ]
         if self.config["bridge.encryption.default"] and self.matrix.e2ee:
@@ -705,21 +723,11 @@ class Portal(DBPortal, BasePortal):
             await self.save()
             self.log.debug(f"Matrix room created: {self.mxid}")
             self.by_mxid[self.mxid] = self
-            await self._update_participants(source, info)
-
-            puppet = await p.Puppet.get_by_custom_mxid(source.mxid)
-            await self.main_intent.invite_user(
-                self.mxid, source.mxid, extra_content=self._get_invite_content(puppet)
+            # Ghosts joining and the user being invited don't depend on each other
+            await asyncio.gather(
+                self._update_participants(source, info),
+                self._invite_user_to_new_room(source),
             )
-            if puppet:
-                try:
-                    if self.is_direct:
-                        await source.update_direct_chats({self.main_intent.mxid: [self.mxid]})
-                    await puppet.intent.join_room_by_id(self.mxid)
-                except MatrixError:
-                    self.log.debug(
-                        "Failed to join custom puppet into newly created portal", exc_info=True
-                    )
 
             await self.backfill(
                 source,
@@ -734,9 +742,32 @@ class Portal(DBPortal, BasePortal):
 
         return self.mxid
 
+    async def _invite_user_to_new_room(self, source: u.User) -> None:
+        puppet = await p.Puppet.get_by_custom_mxid(source.mxid)
+        await self.main_intent.invite_user(
+            self.mxid, source.mxid, extra_content=self._get_invite_content(puppet)
+        )
+        if puppet:
+            try:
+                if self.is_direct:
+                    await source.update_direct_chats({self.main_intent.mxid: [self.mxid]})
+                await puppet.intent.join_room_by_id(self.mxid)
+            except MatrixError:
+                self.log.debug(
+                    "Failed to join custom puppet into newly created portal", exc_info=True
+                )
+
     # endregion
     # region Matrix event handling
 
+    def _add_dedup(self, msg_id: str) -> None:
+        if msg_id in self._dedup:
+            return
+        if len(self._dedup_queue) == self._dedup_queue.maxlen:
+            self._dedup.discard(self._dedup_queue.popleft())
+        self._dedup_queue.append(msg_id)
+        self._dedup.add(msg_id)
+
     def require_send_lock(self, user_id: str) -> asyncio.Lock:
         try:
             lock = self._send_locks[user_id]
@@ -882,11 +913,11 @@ class Portal(DBPortal, BasePortal):
         if message.get_edit():
             await self.handle_matrix_edit(sender, message, event_id)
             return
-        thread_parent = await DBMessage.get_by_mxid(message.get_thread_parent(), self.mxid)
-        if not message.relates_to.is_falling_back:
-            reply_to = await DBMessage.get_by_mxid(message.get_reply_to(), self.mxid)
-        else:
-            reply_to = None
+        thread_parent_id = message.get_thread_parent()
+        reply_to_id = message.get_reply_to() if not message.relates_to.is_falling_back else None
+        targets = await DBMessage.get_many_by_mxid((thread_parent_id, reply_to_id), self.mxid)
+        thread_parent = targets.get(thread_parent_id)
+        reply_to = targets.get(reply_to_id)
         if self.threads_enabled:
             if thread_parent:
                 # If using explicit Matrix threads, always use threads on Google Chat.
@@ -926,7 +957,7 @@ class Portal(DBPortal, BasePortal):
             else:
                 self.log.debug(f"Handled Matrix message {event_id} -> {local_id} -> {resp.gcid}")
                 await self._rec_success(sender, event_id, EventType.ROOM_MESSAGE, message.msgtype)
-                self._dedup.appendleft(resp.gcid)
+                self._add_dedup(resp.gcid)
                 self._local_dedup.remove(local_id)
                 await DBMessage(
                     mxid=event_id,
@@ -1087,8 +1118,13 @@ class Portal(DBPortal, BasePortal):
     ) -> SendResponse:
         if message.file and decrypt_attachment:
             data = await self.main_intent.download_media(message.file.url)
-            data = decrypt_attachment(
-                data, message.file.key.key, message.file.hashes.get("sha256"), message.file.iv
+            data = await asyncio.get_running_loop().run_in_executor(
+                None,
+                decrypt_attachment,
+                data,
+                message.file.key.key,
+                message.file.hashes.get("sha256"),
+                message.file.iv,
             )
         elif message.url:
             data = await self.main_intent.download_media(message.url)
@@ -1130,19 +1166,27 @@ class Portal(DBPortal, BasePortal):
             self.log.debug(f"{user.mxid} left portal to {self.gcid}")
 
     async def handle_matrix_typing(self, users: set[UserID]) -> None:
-        user_map = {mxid: await u.User.get_by_mxid(mxid, create=False) for mxid in users}
-        stopped_typing = [
-            user_map[mxid].client.mark_typing(self.gcid, typing=False)
-            for mxid in self._typing - users
-            if user_map.get(mxid)
-        ]
-        started_typing = [
-            user_map[mxid].client.mark_typing(self.gcid, typing=True)
-            for mxid in users - self._typing
-            if user_map.get(mxid)
-        ]
+        typing_changes: list[tuple[u.User, bool]] = []
+        for mxid in users ^ self._typing:
+            # Users with a Google Chat client are always in the cache, so there's no need to
+            # query the database for the rest of the typers.
+            user = u.User.get_cached_by_mxid(mxid)
+            if user and user.client:
+                typing_changes.append((user, mxid in users))
         self._typing = users
-        await asyncio.gather(*stopped_typing, *started_typing)
+        results = await asyncio.gather(
+            *(
+                user.client.mark_typing(self.gcid, typing=typing)
+                for user, typing in typing_changes
+            ),
+            return_exceptions=True,
+        )
+        for (user, typing), result in zip(typing_changes, results):
+            if isinstance(result, Exception):
+                self.log.warning(
+                    f"Failed to mark {user.mxid} as {'typing' if typing else 'not typing'}",
+                    exc_info=result,
+                )
 
     # endregion
     # region Hangouts event handling
@@ -1343,7 +1387,7 @@ class Portal(DBPortal, BasePortal):
             elif msg_id in self._dedup:
                 self.log.debug(f"Dropping message {msg_id} (found in dedup queue)")
                 return
-            self._dedup.appendleft(msg_id)
+            self._add_dedup(msg_id)
             if await DBMessage.get_by_gcid(msg_id, self.gcid, self.gc_receiver):
                 self.log.debug(f"Dropping message {msg_id} (found in database)")
                 return
@@ -1435,8 +1479,8 @@ class Portal(DBPortal, BasePortal):
             # TODO send notification
             self.log.debug("Unhandled Google Chat message %s", msg_id)
             return
-        for index, (event_id, msgtype) in enumerate(event_ids):
-            await DBMessage(
+        await DBMessage.bulk_insert(
+            DBMessage(
                 mxid=event_id,
                 mx_room=self.mxid,
                 gcid=msg_id,
@@ -1447,13 +1491,15 @@ class Portal(DBPortal, BasePortal):
                 timestamp=evt.create_time,
                 msgtype=msgtype.value,
                 gc_sender=sender.gcid,
-            ).insert()
+            )
+            for index, (event_id, msgtype) in enumerate(event_ids)
+        )
         self.log.debug("Handled Google Chat message %s -> %s", msg_id, event_ids)
         await self._send_delivery_receipt(event_ids[-1][0])
 
     @staticmethod
     async def _download_external_attachment(url: URL, max_size: int) -> tuple[bytearray, str, str]:
-        async with aiohttp.ClientSession() as sess, sess.get(url) as resp:
+        async with p.Puppet.http.get(url) as resp:
             resp.raise_for_status()
             filename = url.path.split("/")[-1]
             data = await maugclib.Client.read_with_max_size(resp, max_size)
@@ -1646,6 +1692,14 @@ class Portal(DBPortal, BasePortal):
             return None
         return await cls.get_by_gcid(conv_id, receiver)
 
+    @classmethod
+    def get_cached_by_group_id(
+        cls, group_id: googlechat.GroupId, receiver: str | None = None
+    ) -> Portal | None:
+        conv_id = maugclib.parsers.id_from_group_id(group_id)
+        receiver = "" if conv_id.startswith("space:") else receiver
+        return cls.by_gcid.get((conv_id, receiver))
+
     @classmethod
     @async_getter_lock
     async def get_by_gcid(cls, gcid: str, receiver: str | None = None) -> Portal:
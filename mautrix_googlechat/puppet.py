@@ -42,6 +42,7 @@ class Puppet(DBPuppet, BasePuppet):
     config: Config
     hs_domain: str
     mxid_template: SimpleTemplate[str]
+    http: aiohttp.ClientSession | None = None
 
     by_gcid: dict[str, Puppet] = {}
     by_custom_mxid: dict[UserID, Puppet] = {}
@@ -115,6 +116,7 @@ class Puppet(DBPuppet, BasePuppet):
             for server, secret in cls.config["bridge.login_shared_secret_map"].items()
         }
         cls.login_device_name = "Google Chat Bridge"
+        cls.http = aiohttp.ClientSession()
 
         return (puppet.try_start() async for puppet in Puppet.get_all_with_custom_mxid())
 
@@ -245,8 +247,7 @@ class Puppet(DBPuppet, BasePuppet):
     async def _reupload_gc_photo(
         self, url: str, intent: IntentAPI, filename: str | None = None
     ) -> tuple[ContentURI, str | None]:
-        async with aiohttp.ClientSession() as session:
-            resp = await session.get(URL(url).with_scheme("https"))
+        async with self.http.get(URL(url).with_scheme("https")) as resp:
             data = await resp.read()
         hasher = sha256()
         hasher.update(data)
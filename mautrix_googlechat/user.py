@@ -17,6 +17,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, AsyncIterable, Awaitable, Iterable, cast
 import asyncio
+import random
 import time
 
 from maugclib import (
@@ -47,6 +48,11 @@ METRIC_SYNC = Histogram("bridge_sync", "calls to sync")
 METRIC_LOGGED_IN = Gauge("bridge_logged_in", "Number of users logged into the bridge")
 METRIC_CONNECTED = Gauge("bridge_connected", "Number of users connected to Google Chat")
 
+GET_MEMBERS_CHUNK_SIZE = 50
+MIN_RECONNECT_BACKOFF = 4
+MAX_RECONNECT_BACKOFF = 300
+MAX_CONCURRENT_INIT = 16
+
 BridgeState.human_readable_errors.update(
     {"get-self-fail": "Failed to get user info from Google Chat"}
 )
@@ -56,27 +62,34 @@ class User(DBUser, BaseUser):
     by_mxid: dict[UserID, User] = {}
     by_gcid: dict[str, User] = {}
     config: Config
+    disable_bridge_notices: bool = False
+    unimportant_bridge_notices: bool = False
+    federate_rooms: bool = True
+    initial_chat_sync: int = 10
+    sync_concurrency: int = 4
 
     client: Client | None
     is_admin: bool
     _db_instance: DBUser | None
 
-    _notice_room_lock: asyncio.Lock
+    _notice_room_future: asyncio.Future | None
     _intentional_disconnect: bool
     name: str | None
     email: str | None
-    name_future: asyncio.Future
+    _name_ready: asyncio.Event
     connected: bool
     _skip_backoff: bool
     _skip_on_connect: bool
+    _connected_event: asyncio.Event
+    _sync_wakeup: asyncio.Event
     _prev_sync: float
     periodic_sync_task: asyncio.Task | None
     conn_task: asyncio.Task | None
 
     groups: dict[str, googlechat.GetGroupResponse]
-    groups_lock: asyncio.Lock
+    _group_inflight: dict[str, asyncio.Future]
     users: dict[str, googlechat.User]
-    users_lock: asyncio.Lock
+    _user_inflight: dict[str, asyncio.Future]
 
     def __init__(
         self,
@@ -96,20 +109,22 @@ class User(DBUser, BaseUser):
             notice_room=notice_room,
         )
         BaseUser.__init__(self)
-        self._notice_room_lock = asyncio.Lock()
+        self._notice_room_future = None
         self.is_whitelisted, self.is_admin, self.level = self.config.get_permissions(mxid)
         self.client = None
         self.name = None
         self.email = None
-        self.name_future = self.loop.create_future()
+        self._name_ready = asyncio.Event()
         self.connected = False
         self._skip_backoff = False
         self._skip_on_connect = False
+        self._connected_event = asyncio.Event()
+        self._sync_wakeup = asyncio.Event()
         self._prev_sync = 0
         self.groups = {}
-        self.groups_lock = asyncio.Lock()
+        self._group_inflight = {}
         self.users = {}
-        self.users_lock = asyncio.Lock()
+        self._user_inflight = {}
         self._intentional_disconnect = False
         self.periodic_sync_task = None
         self.conn_task = None
@@ -126,21 +141,25 @@ class User(DBUser, BaseUser):
         users = await super().all_logged_in()
         user: cls
         for user in users:
-            try:
-                yield cls.by_mxid[user.mxid]
-            except KeyError:
+            cached = cls.by_mxid.get(user.mxid)
+            if cached is not None:
+                yield cached
+            else:
                 user._add_to_cache()
                 yield user
 
+    @classmethod
+    def get_cached_by_mxid(cls, mxid: UserID) -> User | None:
+        return cls.by_mxid.get(mxid)
+
     @classmethod
     @async_getter_lock
     async def get_by_mxid(cls, mxid: UserID, *, create: bool = True) -> User | None:
         if pu.Puppet.get_id_from_mxid(mxid) or mxid == cls.az.bot_mxid:
             return None
-        try:
-            return cls.by_mxid[mxid]
-        except KeyError:
-            pass
+        cached = cls.by_mxid.get(mxid)
+        if cached is not None:
+            return cached
 
         user = cast(cls, await super().get_by_mxid(mxid))
         if user is not None:
@@ -159,10 +178,9 @@ class User(DBUser, BaseUser):
     @classmethod
     @async_getter_lock
     async def get_by_gcid(cls, gcid: str) -> User | None:
-        try:
-            return cls.by_gcid[gcid]
-        except KeyError:
-            pass
+        cached = cls.by_gcid.get(gcid)
+        if cached is not None:
+            return cached
 
         user = cast(cls, await super().get_by_gcid(gcid))
         if user is not None:
@@ -191,14 +209,15 @@ class User(DBUser, BaseUser):
             state.remote_name = puppet.name
 
     async def get_notice_room(self) -> RoomID:
-        if not self.notice_room:
-            async with self._notice_room_lock:
-                # If someone already created the room while this call was waiting,
-                # don't make a new room
-                if self.notice_room:
-                    return self.notice_room
+        while not self.notice_room:
+            if self._notice_room_future:
+                # Someone is already creating the room, wait for them and check again
+                await asyncio.shield(self._notice_room_future)
+                continue
+            fut = self._notice_room_future = self.loop.create_future()
+            try:
                 creation_content = {}
-                if not self.config["bridge.federate_rooms"]:
+                if not self.federate_rooms:
                     creation_content["m.federate"] = False
                 self.notice_room = await self.az.intent.create_room(
                     is_direct=True,
@@ -207,6 +226,9 @@ class User(DBUser, BaseUser):
                     creation_content=creation_content,
                 )
                 await self.save()
+            finally:
+                self._notice_room_future = None
+                fut.set_result(None)
         return self.notice_room
 
     async def send_bridge_notice(
@@ -214,9 +236,9 @@ class User(DBUser, BaseUser):
     ) -> None:
         if state_event:
             await self.push_bridge_state(state_event, message=text)
-        if self.config["bridge.disable_bridge_notices"]:
+        if self.disable_bridge_notices:
             return
-        elif not important and not self.config["bridge.unimportant_bridge_notices"]:
+        elif not important and not self.unimportant_bridge_notices:
             return
         msgtype = MessageType.TEXT if important else MessageType.NOTICE
         try:
@@ -227,13 +249,29 @@ class User(DBUser, BaseUser):
     async def is_logged_in(self) -> bool:
         return self.client and self.connected
 
+    async def wait_for_name(self) -> str | None:
+        # Returns None if fetching own info failed or the user was logged out
+        if not self._name_ready.is_set():
+            await self._name_ready.wait()
+        return self.name
+
     @classmethod
     def init_cls(cls, bridge: "GoogleChatBridge") -> AsyncIterable[Awaitable[None]]:
         cls.bridge = bridge
         cls.az = bridge.az
         cls.config = bridge.config
         cls.loop = bridge.loop
-        return (user._try_init() async for user in cls.all_logged_in())
+        cls.disable_bridge_notices = cls.config["bridge.disable_bridge_notices"]
+        cls.unimportant_bridge_notices = cls.config["bridge.unimportant_bridge_notices"]
+        cls.federate_rooms = cls.config["bridge.federate_rooms"]
+        cls.initial_chat_sync = cls.config["bridge.initial_chat_sync"]
+        cls.sync_concurrency = cls.config["bridge.sync_concurrency"]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_INIT)
+        return (user._try_init_limited(semaphore) async for user in cls.all_logged_in())
+
+    async def _try_init_limited(self, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            await self._try_init()
 
     async def _try_init(self) -> None:
         try:
@@ -258,6 +296,7 @@ class User(DBUser, BaseUser):
 
     async def connect(self, cookies: Cookies | None = None, get_self: bool = False) -> bool:
         self.log.debug("Running post-login actions")
+        self._name_ready.clear()
         client = Client(
             cookies or self.cookies,
             user_agent=self.user_agent,
@@ -297,78 +336,23 @@ class User(DBUser, BaseUser):
             self.log.exception("Fatal error in Google Chat connection")
 
     async def _start(self) -> None:
-        last_disconnection = 0
-        backoff = 4
-        backoff_reset_in_seconds = 60
+        backoff = 0
         state_event = BridgeStateEvent.TRANSIENT_DISCONNECT
         self._intentional_disconnect = False
-        while True:
-            if self._intentional_disconnect:
-                self.log.warning("Client connection already finished, not restarting")
-                return
-            try:
-                await self.client.connect(max_age=1.5 * 60 * 60)
-                self._track_metric(METRIC_CONNECTED, False)
-                if self._intentional_disconnect:
-                    self.log.info("Client connection finished")
-                    return
-                elif self._skip_backoff:
-                    self._skip_backoff = False
-                    self.log.debug("Client connection was terminated for reconnection")
-                    continue
-                else:
-                    self.log.warning("Client connection finished unexpectedly")
-                    error_msg = "Client connection finished unexpectedly"
-            except ChannelLifetimeExpired:
-                self.log.debug("Client connection was terminated after being alive too long")
-                self._skip_on_connect = True
+        while not self._intentional_disconnect:
+            error_msg = await self._run_connection()
+            if error_msg is None:
+                # Either the connection was stopped intentionally (which ends the loop)
+                # or it should be reconnected immediately without backing off.
                 continue
-            except SIDInvalidError:
-                if self._prev_sync + 3 * 60 < time.monotonic():
-                    self.log.debug(
-                        "Client connection was terminated due to invalid SID error, "
-                        "doing small sync to check for missed messages"
-                    )
-                    try:
-                        backfilled_count = await self.sync(limit=3)
-                    except Exception:
-                        self.log.exception("Failed to sync recent chats")
-                        backfilled_count = None
-                    if backfilled_count:
-                        self.log.debug(
-                            f"Sync backfilled {backfilled_count} chats,"
-                            " doing full sync on reconnect"
-                        )
-                    else:
-                        self.log.debug("Sync didn't backfill anything")
-                        self._skip_on_connect = True
-                    continue
-                else:
-                    self.log.warning(
-                        "Client connection was terminated due to invalid SID error, "
-                        "but previous sync was less than 3 minutes ago"
-                    )
-                    error_msg = f"Unknown SID error in Google Chat connection"
-            except Exception as e:
-                self._track_metric(METRIC_CONNECTED, False)
-                self.log.exception("Exception in connection")
-                if isinstance(e, ResponseError):
-                    self.log.debug("Response error body: %s", e.body)
-                if isinstance(e, UnexpectedStatusError) and (
-                    e.error_code == "invalid_grant" or e.status == 401
-                ):
-                    self.log.info(
-                        "Connection error has 401 status or invalid_grant error code, logging out"
-                    )
-                    background_task.create(self.logout(is_manual=False, error=e))
-                    return
-                error_msg = f"Exception in Google Chat connection: {e}"
 
-            if last_disconnection + backoff_reset_in_seconds < time.time():
-                backoff = 4
+            # Only reset the backoff if the previous attempt actually managed to connect
+            if not backoff or self._connected_event.is_set():
+                self._connected_event.clear()
+                backoff = MIN_RECONNECT_BACKOFF
                 state_event = BridgeStateEvent.TRANSIENT_DISCONNECT
             else:
-                backoff = int(backoff * 1.5)
+                backoff = min(backoff * 2, MAX_RECONNECT_BACKOFF)
                 if backoff > 60:
                     state_event = BridgeStateEvent.UNKNOWN_ERROR
             try:
@@ -377,16 +361,81 @@ class User(DBUser, BaseUser):
                     state_event=state_event,
                     important=state_event == BridgeStateEvent.UNKNOWN_ERROR,
                 )
-                last_disconnection = time.time()
-                self.log.debug(f"Reconnecting in {backoff} seconds")
-                await asyncio.sleep(backoff)
+                sleep_time = backoff * random.uniform(0.5, 1.5)
+                self.log.debug(f"Reconnecting in {sleep_time:.1f} seconds")
+                await asyncio.sleep(sleep_time)
             except asyncio.CancelledError:
                 self.log.debug("Connection task was cancelled while waiting to reconnect")
                 return
             except Exception:
                 self.log.exception("Error waiting to reconnect")
 
-    async def stop(self) -> None:
+    async def _run_connection(self) -> str | None:
+        # Returns an error message if reconnecting should be delayed, None otherwise
+        try:
+            await self.client.connect(max_age=1.5 * 60 * 60)
+            self._track_metric(METRIC_CONNECTED, False)
+            if self._intentional_disconnect:
+                self.log.info("Client connection finished")
+                return None
+            elif self._skip_backoff:
+                self._skip_backoff = False
+                self.log.debug("Client connection was terminated for reconnection")
+                return None
+            self.log.warning("Client connection finished unexpectedly")
+            return "Client connection finished unexpectedly"
+        except ChannelLifetimeExpired:
+            self.log.debug("Client connection was terminated after being alive too long")
+            self._skip_on_connect = True
+            return None
+        except SIDInvalidError:
+            if self._prev_sync + 3 * 60 < time.monotonic():
+                self.log.debug(
+                    "Client connection was terminated due to invalid SID error, "
+                    "doing small sync to check for missed messages"
+                )
+                try:
+                    backfilled_count = await self.sync(limit=3)
+                except Exception:
+                    self.log.exception("Failed to sync recent chats")
+                    backfilled_count = None
+                if backfilled_count:
+                    self.log.debug(
+                        f"Sync backfilled {backfilled_count} chats, doing full sync on reconnect"
+                    )
+                else:
+                    self.log.debug("Sync didn't backfill anything")
+                    self._skip_on_connect = True
+                return None
+            self.log.warning(
+                "Client connection was terminated due to invalid SID error, "
+                "but previous sync was less than 3 minutes ago"
+            )
+            return "Unknown SID error in Google Chat connection"
+        except Exception as e:
+            self._track_metric(METRIC_CONNECTED, False)
+            self.log.exception("Exception in connection")
+            if isinstance(e, ResponseError):
+                self.log.debug("Response error body: %s", e.body)
+            if isinstance(e, UnexpectedStatusError) and (
+                e.error_code == "invalid_grant" or e.status == 401
+            ):
+                self.log.info(
+                    "Connection error has 401 status or invalid_grant error code, logging out"
+                )
+                self._intentional_disconnect = True
+                background_task.create(self.logout(is_manual=False, error=e))
+                return None
+            return f"Exception in Google Chat connection: {e}"
+
+    @classmethod
+    async def stop_all(cls) -> None:
+        users = list(cls.by_mxid.values())
+        for user in users:
+            await user.stop(save=False)
+        await cls.save_many(users)
+
+    async def stop(self, save: bool = True) -> None:
         if self.client:
             self._intentional_disconnect = True
             self.client.disconnect()
@@ -396,7 +445,8 @@ class User(DBUser, BaseUser):
         if self.conn_task:
             self.conn_task.cancel()
             self.conn_task = None
-        await self.save()
+        if save:
+            await self.save()
 
     async def logout(self, is_manual: bool, error: UnexpectedStatusError | None = None) -> None:
         if self.gcid:
@@ -425,12 +475,13 @@ class User(DBUser, BaseUser):
 
         self.name = None
         self.email = None
-        if not self.name_future.done():
-            self.name_future.set_exception(Exception("logged out"))
-        self.name_future = self.loop.create_future()
+        # Wake up anything waiting for the name, they'll see that there isn't one
+        self._name_ready.set()
+        self._name_ready.clear()
 
     async def on_connect(self) -> None:
         self.connected = True
+        self._connected_event.set()
         if not self._skip_on_connect:
             background_task.create(self.on_connect_later())
             await self.send_bridge_notice("Connected to Google Chat")
@@ -464,44 +515,66 @@ class User(DBUser, BaseUser):
         return user
 
     async def get_users(self, ids: Iterable[str]) -> list[googlechat.User]:
-        async with self.users_lock:
-            req_ids = [
-                googlechat.MemberId(user_id=googlechat.UserId(id=user_id))
-                for user_id in ids
-                if user_id not in self.users and user_id
-            ]
-            if req_ids:
-                self.log.debug(f"Fetching info of users {[user.user_id.id for user in req_ids]}")
-                resp = await self.client.proto_get_members(
-                    googlechat.GetMembersRequest(
-                        request_header=self.client.gc_request_header,
-                        member_ids=req_ids,
+        ids = list(ids)
+        missing = {user_id for user_id in ids if user_id and user_id not in self.users}
+        # Other calls may already be fetching some of the users, wait for those instead of
+        # requesting them again.
+        waiting = {
+            self._user_inflight[user_id] for user_id in missing & self._user_inflight.keys()
+        }
+        to_fetch = [user_id for user_id in missing if user_id not in self._user_inflight]
+        if to_fetch:
+            await self._fetch_users(to_fetch)
+        if waiting:
+            await asyncio.wait(waiting)
+            # If one of the other fetches failed, try again for the users it didn't get
+            retry = [user_id for user_id in missing if user_id not in self.users]
+            if retry:
+                await self._fetch_users(retry)
+        return [self.users[user_id] for user_id in ids]
+
+    async def _fetch_users(self, ids: list[str]) -> None:
+        fut = self.loop.create_future()
+        for user_id in ids:
+            self._user_inflight[user_id] = fut
+        try:
+            self.log.debug(f"Fetching info of users {ids}")
+            resps = await asyncio.gather(
+                *(
+                    self.client.proto_get_members(
+                        googlechat.GetMembersRequest(
+                            request_header=self.client.gc_request_header,
+                            member_ids=[
+                                googlechat.MemberId(user_id=googlechat.UserId(id=user_id))
+                                for user_id in ids[i : i + GET_MEMBERS_CHUNK_SIZE]
+                            ],
+                        )
                     )
+                    for i in range(0, len(ids), GET_MEMBERS_CHUNK_SIZE)
                 )
-                member: googlechat.Member
+            )
+            member: googlechat.Member
+            for resp in resps:
                 for member in resp.members:
                     self.users[member.user.user_id.id] = member.user
-        return [self.users[user_id] for user_id in ids]
+        finally:
+            for user_id in ids:
+                if self._user_inflight.get(user_id) is fut:
+                    del self._user_inflight[user_id]
+            fut.set_result(None)
 
     async def get_group(
         self, id: googlechat.GroupId | str, revision: int
     ) -> googlechat.GetGroupResponse:
-        if isinstance(id, str):
-            group_id = maugclib.parsers.group_id_from_id(id)
-            conv_id = id
-        else:
-            group_id = id
-            conv_id = maugclib.parsers.id_from_group_id(id)
-        try:
-            group = self.groups[conv_id]
-        except KeyError:
-            pass
-        else:
-            if group.group_revision.timestamp >= revision:
-                return group
-
-        async with self.groups_lock:
-            # Try again in case the fetch succeeded while waiting for the lock
+        conv_id = id if isinstance(id, str) else maugclib.parsers.id_from_group_id(id)
+        # Fast path: don't touch anything else if the cached info is recent enough
+        group = self.groups.get(conv_id)
+        if group is not None and group.group_revision.timestamp >= revision:
+            return group
+        return await self._fetch_group(conv_id, revision)
+
+    async def _fetch_group(self, conv_id: str, revision: int) -> googlechat.GetGroupResponse:
+        while True:
             try:
                 group = self.groups[conv_id]
             except KeyError:
@@ -509,11 +582,20 @@ class User(DBUser, BaseUser):
             else:
                 if group.group_revision.timestamp >= revision:
                     return group
+            try:
+                inflight = self._group_inflight[conv_id]
+            except KeyError:
+                break
+            # Another call is already fetching this chat, wait for it and check the cache again
+            await asyncio.shield(inflight)
+
+        fut = self._group_inflight[conv_id] = self.loop.create_future()
+        try:
             self.log.debug(f"Fetching info of chat {conv_id}")
             resp = await self.client.proto_get_group(
                 googlechat.GetGroupRequest(
                     request_header=self.client.gc_request_header,
-                    group_id=group_id,
+                    group_id=maugclib.parsers.group_id_from_id(conv_id),
                     fetch_options=[
                         googlechat.GetGroupRequest.MEMBERS,
                         googlechat.GetGroupRequest.INCLUDE_DYNAMIC_GROUP_NAME,
@@ -521,6 +603,9 @@ class User(DBUser, BaseUser):
                 )
             )
             self.groups[conv_id] = resp
+        finally:
+            del self._group_inflight[conv_id]
+            fut.set_result(None)
         return resp
 
     async def on_connect_later(self) -> None:
@@ -528,8 +613,7 @@ class User(DBUser, BaseUser):
             self_info = await self.get_self()
         except Exception:
             self.log.exception("Failed to get own info")
-            if not self.name_future.done():
-                self.name_future.set_exception(Exception("failed to get own info"))
+            self._name_ready.set()
             await self.push_bridge_state(BridgeStateEvent.BAD_CREDENTIALS, error="get-self-fail")
             return
         await self.push_bridge_state(BridgeStateEvent.BACKFILLING)
@@ -537,8 +621,7 @@ class User(DBUser, BaseUser):
         self.name = self_info.name or self_info.first_name
         self.email = self_info.email
         self.log.debug(f"Found own name: {self.name}")
-        if not self.name_future.done():
-            self.name_future.set_result(self.name)
+        self._name_ready.set()
 
         self._track_metric(METRIC_CONNECTED, True)
         self._track_metric(METRIC_LOGGED_IN, True)
@@ -561,6 +644,7 @@ class User(DBUser, BaseUser):
 
     async def on_reconnect(self) -> None:
         self.connected = True
+        self._connected_event.set()
         await self.send_bridge_notice("Reconnected to Google Chat")
         await self.push_bridge_state(BridgeStateEvent.CONNECTED)
 
@@ -572,13 +656,24 @@ class User(DBUser, BaseUser):
         )
 
     def reconnect(self) -> None:
+        self._disconnect_for_reconnect()
+        # The reconnect will do a full sync, so restart the periodic sync timer
+        self._sync_wakeup.set()
+
+    def _disconnect_for_reconnect(self) -> None:
         self._skip_backoff = True
         self.client.disconnect()
 
     async def _periodic_sync(self) -> None:
         while True:
             try:
-                await asyncio.sleep(60 * 60)
+                try:
+                    await asyncio.wait_for(self._sync_wakeup.wait(), timeout=60 * 60)
+                except asyncio.TimeoutError:
+                    pass
+                else:
+                    self._sync_wakeup.clear()
+                    continue
                 if self._prev_sync + 3 * 60 > time.monotonic():
                     self.log.debug("Skipping periodic sync, less than 3 minutes since last sync")
                     continue
@@ -586,7 +681,7 @@ class User(DBUser, BaseUser):
                 backfilled_count = await self.sync(limit=3)
                 if backfilled_count:
                     self.log.debug(f"Periodic sync backfilled {backfilled_count} chats")
-                    self.reconnect()
+                    self._disconnect_for_reconnect()
                 else:
                     self.log.debug("Periodic sync didn't backfill anything")
             except asyncio.CancelledError:
@@ -620,24 +715,28 @@ class User(DBUser, BaseUser):
         if limit:
             req.world_section_requests.append(googlechat.WorldSectionRequest(page_size=limit))
         resp = await self.client.proto_paginated_world(req)
-        items: list[googlechat.WorldItemLite] = list(resp.world_items)
-        items.sort(key=lambda item: item.sort_timestamp, reverse=True)
-        max_sync = self.config["bridge.initial_chat_sync"]
-        portals_to_sync: list[tuple[po.Portal, googlechat.WorldItemLite]] = []
-        prefetch_users: set[str] = set()
-        for index, item in enumerate(items):
-            conv_id = maugclib.parsers.id_from_group_id(item.group_id)
+        items: list[googlechat.WorldItemLite] = []
+        for item in resp.world_items:
             if (
                 item.read_state.blocked
                 or item.read_state.hide_timestamp > 0
                 or item.read_state.membership_state != googlechat.MEMBER_JOINED
             ):
-                self.log.trace(f"Skipping unwanted chat %s", conv_id)
+                self.log.trace(
+                    "Skipping unwanted chat %s", maugclib.parsers.id_from_group_id(item.group_id)
+                )
                 continue
+            items.append(item)
+        items.sort(key=lambda item: item.sort_timestamp, reverse=True)
+        max_sync = self.initial_chat_sync
+        portals_to_sync: list[tuple[po.Portal, googlechat.WorldItemLite]] = []
+        prefetch_users: list[str] = []
+        for index, item in enumerate(items):
+            conv_id = maugclib.parsers.id_from_group_id(item.group_id)
             portal = await po.Portal.get_by_gcid(conv_id, self.gcid)
             if portal.mxid or index < max_sync:
                 if item.HasField("dm_members"):
-                    prefetch_users |= {member.id for member in item.dm_members.members}
+                    prefetch_users.extend(member.id for member in item.dm_members.members)
                 portals_to_sync.append((portal, item))
 
         # To avoid the portal sync sending individual get user requests for each DM portal,
@@ -645,8 +744,34 @@ class User(DBUser, BaseUser):
         # participants separately, but that's probably fine since they can be larger anyway.
         await self.get_users(prefetch_users)
 
+        semaphore = asyncio.Semaphore(self.sync_concurrency)
+        results = await asyncio.gather(
+            *(
+                self._sync_portal(portal, info, limit, semaphore)
+                for portal, info in portals_to_sync
+            ),
+            return_exceptions=True,
+        )
         backfilled_count = 0
-        for portal, info in portals_to_sync:
+        for (portal, _), result in zip(portals_to_sync, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            elif isinstance(result, BaseException):
+                self.log.error(f"Failed to sync {portal.gcid}", exc_info=result)
+            elif result:
+                backfilled_count += 1
+
+        await self.update_direct_chats()
+        return backfilled_count
+
+    async def _sync_portal(
+        self,
+        portal: po.Portal,
+        info: googlechat.WorldItemLite,
+        limit: int | None,
+        semaphore: asyncio.Semaphore,
+    ) -> bool:
+        async with semaphore:
             self.log.debug("Syncing %s", portal.gcid)
             if portal.mxid:
                 if limit is None:
@@ -655,14 +780,11 @@ class User(DBUser, BaseUser):
                     msg_count = await portal.backfill(
                         self, info.group_revision.timestamp, read_state=info.read_state
                     )
-                    if msg_count > 0:
-                        backfilled_count += 1
+                    return msg_count > 0
+                return False
             else:
                 await portal.create_matrix_room(self, info)
-                backfilled_count += 1
-
-        await self.update_direct_chats()
-        return backfilled_count
+                return True
 
     async def get_direct_chats(self) -> dict[UserID, list[RoomID]]:
         return {
@@ -672,12 +794,18 @@ class User(DBUser, BaseUser):
         }
 
     async def on_stream_event(self, evt: googlechat.Event) -> None:
-        group_id = evt.group_id
         if evt.type == googlechat.Event.TYPING_STATE_CHANGED:
-            group_id = evt.body.typing_state_changed.context.group_id
-        portal = await po.Portal.get_by_group_id(group_id, self.gcid)
-        if portal:
-            portal.queue_event(self, evt)
+            # Typing notifications are only bridged to existing rooms, so there's no point in
+            # going to the database (and possibly creating a portal) if it's not in memory.
+            portal = po.Portal.get_cached_by_group_id(
+                evt.body.typing_state_changed.context.group_id, self.gcid
+            )
+            if portal and portal.mxid:
+                portal.queue_event(self, evt)
+        else:
+            portal = await po.Portal.get_by_group_id(evt.group_id, self.gcid)
+            if portal:
+                portal.queue_event(self, evt)
         if evt.HasField("user_revision"):
             await self.set_revision(evt.user_revision.timestamp)
 
@@ -17,6 +17,8 @@ from __future__ import annotations
 
 from typing import Any
 import asyncio
+import hmac
+import json
 import logging
 
 from aiohttp import web
@@ -28,7 +30,7 @@ from mautrix.types import UserID
 from .. import user as u
 
 
-class ErrorResponse(Exception):
+class ErrorResponse(web.HTTPException):
     def __init__(
         self,
         status_code: int,
@@ -36,20 +38,11 @@ class ErrorResponse(Exception):
         errcode: str,
         extra_data: dict[str, Any] | None = None,
     ) -> None:
-        super().__init__(error)
         self.status_code = status_code
-        self.message = error
         self.error = error
         self.errcode = errcode
-        self.payload = {**(extra_data or {}), "error": self.error, "errcode": self.errcode}
-
-
-@web.middleware
-async def error_middleware(request: web.Request, handler) -> web.Response:
-    try:
-        return await handler(request)
-    except ErrorResponse as e:
-        return web.json_response(status=e.status_code, data=e.payload)
+        payload = {**(extra_data or {}), "error": error, "errcode": errcode}
+        super().__init__(text=json.dumps(payload), content_type="application/json")
 
 
 log = logging.getLogger("mau.gc.auth")
@@ -65,13 +58,13 @@ class GoogleChatAuthServer:
         self.ongoing = {}
         self.shared_secret = shared_secret
 
-        self.app = web.Application(middlewares=[error_middleware])
+        self.app = web.Application()
         self.app.router.add_get("/v1/whoami", self.whoami)
         self.app.router.add_post("/v1/login", self.login)
         self.app.router.add_post("/v1/logout", self.logout)
         self.app.router.add_post("/v1/reconnect", self.reconnect)
 
-        self.legacy_app = web.Application(middlewares=[error_middleware])
+        self.legacy_app = web.Application()
         self.legacy_app.router.add_post("/api/verify", self.verify)
         self.legacy_app.router.add_post("/api/logout", self.logout)
         self.legacy_app.router.add_post("/api/authorization", self.login)
@@ -86,13 +79,21 @@ class GoogleChatAuthServer:
         if not token.startswith("Bearer "):
             raise ErrorResponse(401, "Invalid authorization header content", "M_MISSING_TOKEN")
         token = token[len("Bearer ") :]
-        if not self.shared_secret or token != self.shared_secret:
+        if not self.shared_secret or not hmac.compare_digest(
+            token.encode("utf-8"), self.shared_secret.encode("utf-8")
+        ):
             raise ErrorResponse(401, "Invalid access token", "M_UNKNOWN_TOKEN")
         try:
             return UserID(request.query["user_id"])
         except KeyError:
             raise ErrorResponse(400, "Missing user_id query parameter", "M_MISSING_PARAM")
 
+    async def get_user(self, request: web.Request) -> u.User:
+        user = await u.User.get_by_mxid(self.verify_token(request))
+        if not user:
+            raise ErrorResponse(400, "Invalid user_id query parameter", "M_INVALID_PARAM")
+        return user
+
     async def verify(self, request: web.Request) -> web.Response:
         return web.json_response(
             {
@@ -101,14 +102,12 @@ class GoogleChatAuthServer:
         )
 
     async def logout(self, request: web.Request) -> web.Response:
-        user_id = self.verify_token(request)
-        user = await u.User.get_by_mxid(user_id)
+        user = await self.get_user(request)
         await user.logout(is_manual=True)
         return web.json_response({})
 
     async def whoami(self, request: web.Request) -> web.Response:
-        user_id = self.verify_token(request)
-        user = await u.User.get_by_mxid(user_id)
+        user = await self.get_user(request)
         return web.json_response(
             {
                 "permissions": user.level,
@@ -125,16 +124,20 @@ class GoogleChatAuthServer:
         )
 
     async def reconnect(self, request: web.Request) -> web.Response:
-        user_id = self.verify_token(request)
-        user = await u.User.get_by_mxid(user_id)
+        user = await self.get_user(request)
         user.reconnect()
         return web.json_response({})
 
     async def login(self, request: web.Request) -> web.Response:
-        user_id = self.verify_token(request)
-        user = await u.User.get_by_mxid(user_id)
+        user = await self.get_user(request)
         if user.client:
-            await user.name_future
+            if not await user.wait_for_name():
+                return web.json_response(
+                    {
+                        "status": "fail",
+                        "error": "Failed to get own info",
+                    }
+                )
             return web.json_response(
                 {
                     "status": "success",
@@ -180,7 +183,13 @@ class GoogleChatAuthServer:
                 status=500,
             )
         else:
-            await asyncio.wait_for(asyncio.shield(user.name_future), 20)
+            if not await asyncio.wait_for(user.wait_for_name(), 20):
+                return web.json_response(
+                    {
+                        "status": "fail",
+                        "error": "Failed to get own info after login",
+                    }
+                )
             return web.json_response(
                 {
                     "status": "success",